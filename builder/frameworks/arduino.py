@@ -23,14 +23,19 @@ http://arduino.cc/en/Reference/HomePage
 """
 
 import os
+import re
 import sys
+import json
 import shutil
+import stat
 import hashlib
+import functools
 import threading
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import suppress
-from os.path import join, exists, isabs, splitdrive, commonpath, relpath
+from os.path import join, exists, isabs, splitdrive, relpath
 from pathlib import Path
-from typing import Union, List
+from typing import Optional, Union, List
 
 from SCons.Script import DefaultEnvironment, SConscript
 from platformio import fs
@@ -44,6 +49,8 @@ UNICORE_FLAGS = {
     "CONFIG_FREERTOS_UNICORE=y"
 }
 
+UNICORE_FLAGS_RE = re.compile("|".join(map(re.escape, UNICORE_FLAGS)))
+
 # Thread-safe global flags to prevent message spam
 _PATH_SHORTENING_LOCK = threading.Lock()
 _PATH_SHORTENING_MESSAGES = {
@@ -316,6 +323,33 @@ class PathCache:
         return self._sdk_dir
 
 
+def _get_long_path_cache_file():
+    """Returns the path of the on-disk long path support cache"""
+    return join(config.get("platformio", "core_dir"), ".cache",
+                "longpaths.json")
+
+
+def _is_long_path_support_cached(windows_build):
+    """Checks if long path support was already found enabled on this build"""
+    try:
+        with open(_get_long_path_cache_file(), "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return data.get("build") == windows_build and data.get("enabled")
+    except (OSError, ValueError, AttributeError):
+        return False
+
+
+def _cache_long_path_support(windows_build):
+    """Persists enabled long path support for the given Windows build"""
+    cache_file = _get_long_path_cache_file()
+    tmp_file = cache_file + ".tmp"
+    with suppress(OSError):
+        os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump({"build": windows_build, "enabled": True}, f)
+        os.replace(tmp_file, cache_file)
+
+
 def check_and_warn_long_path_support():
     """Checks Windows long path support and issues warning if disabled"""
     with _PATH_SHORTENING_LOCK:  # Thread-safe access
@@ -323,6 +357,13 @@ def check_and_warn_long_path_support():
                 'long_path_warning_shown']:
             return
 
+        # Only the enabled state is cached, so a disabled setting is
+        # re-checked on every run until the user turns it on
+        windows_build = sys.getwindowsversion().build
+        if _is_long_path_support_cached(windows_build):
+            _PATH_SHORTENING_MESSAGES['long_path_warning_shown'] = True
+            return
+
         try:
             import winreg
             key = winreg.OpenKey(
@@ -332,22 +373,25 @@ def check_and_warn_long_path_support():
             value, _ = winreg.QueryValueEx(key, "LongPathsEnabled")
             winreg.CloseKey(key)
 
-            if value != 1:
-                print("*** WARNING: Windows Long Path Support is disabled ***")
-                print("*** Enable it for better performance: ***")
-                print("*** 1. Run as Administrator: gpedit.msc ***")
-                print("*** 2. Navigate to: Computer Configuration > "
-                      "Administrative Templates > System > Filesystem ***")
-                print("*** 3. Enable 'Enable Win32 long paths' ***")
-                print("*** OR run PowerShell as Admin: ***")
-                print("*** New-ItemProperty -Path "
-                      "'HKLM:\\SYSTEM\\CurrentControlSet\\Control\\FileSystem' "
-                      "-Name 'LongPathsEnabled' -Value 1 -PropertyType DWORD "
-                      "-Force ***")
-                print("*** Restart required after enabling ***")
+            if value == 1:
+                _cache_long_path_support(windows_build)
+            else:
+                print("\n".join((
+                    "*** WARNING: Windows Long Path Support is disabled ***",
+                    "*** Enable it for better performance: ***",
+                    "*** 1. Run as Administrator: gpedit.msc ***",
+                    "*** 2. Navigate to: Computer Configuration > "
+                    "Administrative Templates > System > Filesystem ***",
+                    "*** 3. Enable 'Enable Win32 long paths' ***",
+                    "*** OR run PowerShell as Admin: ***",
+                    "*** New-ItemProperty -Path "
+                    "'HKLM:\\SYSTEM\\CurrentControlSet\\Control\\FileSystem' "
+                    "-Name 'LongPathsEnabled' -Value 1 -PropertyType DWORD "
+                    "-Force ***",
+                    "*** Restart required after enabling ***")))
         except Exception:
-            print("*** WARNING: Could not check Long Path Support status ***")
-            print("*** Consider enabling Windows Long Path Support for "
+            print("*** WARNING: Could not check Long Path Support status ***\n"
+                  "*** Consider enabling Windows Long Path Support for "
                   "better performance ***")
 
         _PATH_SHORTENING_MESSAGES['long_path_warning_shown'] = True
@@ -387,55 +431,112 @@ def safe_delete_file(file_path: Union[str, Path],
         return False
 
 
-def safe_delete_directory(dir_path: Union[str, Path]) -> bool:
+def safe_delete_directory(dir_path: Union[str, Path],
+                          dir_stat: Optional[os.stat_result] = None) -> bool:
     """
     Secure directory deletion
+
+    Top-level subdirectories are removed in parallel, which speeds up
+    deleting large framework trees where per-file latency dominates.
+    A caller that already probed the directory can pass its lstat result.
     """
     dir_path = Path(dir_path)
 
     try:
-        if not dir_path.exists():
+        # A missing directory raises and is reported as failure
+        if dir_stat is None:
+            dir_stat = os.lstat(dir_path)
+
+        # Never walk through a symlinked directory, like shutil.rmtree
+        if stat.S_ISLNK(dir_stat.st_mode):
             return False
 
-        shutil.rmtree(dir_path)
+        subdirs = []
+        with os.scandir(dir_path) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append(entry.path)
+                else:
+                    os.unlink(entry.path)
+
+        max_workers = min(8, os.cpu_count() or 2)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            # Consume results to propagate the first error
+            list(executor.map(shutil.rmtree, subdirs))
+
+        dir_path.rmdir()
         return True
 
     except Exception as e:
         return False
 
 
+_FRAMEWORK_INDICATORS = (
+    "framework-arduinoespressif32",
+    "framework-arduinoespressif32-libs"
+)
+# Lower case to match the normcase'd path on Windows
+_CRITICAL_SUBSTRINGS = ("/usr", "/bin", "/sbin", "/etc", "/boot",
+                        "c:\\windows", "c:\\program files")
+
+
+def _is_framework_package_path(path_str: str) -> bool:
+    """Checks a normalized path string against the package path rules"""
+    # Must be within .platformio directory structure
+    if ".platformio" not in path_str:
+        return False
+
+    # Must be a packages directory
+    if "packages" not in path_str:
+        return False
+
+    # Must be framework-related
+    if not any(indicator in path_str
+               for indicator in _FRAMEWORK_INDICATORS):
+        return False
+
+    # Must not be a critical system path
+    return not any(critical in path_str
+                   for critical in _CRITICAL_SUBSTRINGS)
+
+
 def validate_platformio_path(path: Union[str, Path]) -> bool:
     """
     Enhanced validation for PlatformIO package paths
     """
     try:
-        path = Path(path).resolve()
-        path_str = str(path)
-
-        # Must be within .platformio directory structure
-        if ".platformio" not in path_str:
+        # Lexical normalization collapses ".." without any filesystem access
+        path_str = os.path.normcase(os.path.normpath(os.fspath(path)))
+        if not _is_framework_package_path(path_str):
             return False
 
-        # Must be a packages directory
-        if "packages" not in path_str:
-            return False
+        # Resolve once so a symlink cannot escape the packages directory
+        real_str = os.path.normcase(os.path.realpath(path_str))
+        return real_str == path_str or _is_framework_package_path(real_str)
 
-        # Must be framework-related
-        framework_indicators = [
-            "framework-arduinoespressif32",
-            "framework-arduinoespressif32-libs"
-        ]
+    except Exception as e:
+        return False
 
-        if not any(indicator in path_str for indicator in framework_indicators):
-            return False
 
-        # Must not be a critical system path
-        critical_paths = ["/usr", "/bin", "/sbin", "/etc", "/boot",
-                          "C:\\Windows", "C:\\Program Files"]
-        return not any(critical in path_str for critical in critical_paths)
+def _normalize_critical_path(path):
+    """Resolves and normalizes a critical system path for comparison"""
+    return os.path.normcase(str(Path(path).resolve()))
 
-    except Exception as e:
-        return False
+
+# Critical system paths which must never be deleted or contain deleted paths
+_CRITICAL_PATHS = frozenset(
+    _normalize_critical_path(p) for p in filter(None, (
+        Path.home(),
+        "/",
+        "C:\\" if IS_WINDOWS else None,
+        "/usr",
+        "/etc",
+        "/bin",
+        "/sbin"
+    ))
+)
+_CRITICAL_PREFIXES = tuple(
+    p.rstrip("\\/") + os.sep for p in _CRITICAL_PATHS)
 
 
 def validate_deletion_path(path: Union[str, Path],
@@ -450,66 +551,64 @@ def validate_deletion_path(path: Union[str, Path],
     Returns:
         bool: True if deletion is safe
     """
-    path = Path(path).resolve()
+    try:
+        path_str = str(Path(path).resolve())
+    except (OSError, ValueError):
+        # Path resolution failed, reject for safety
+        return False
 
     # Check against critical system paths
-    critical_paths = [
-        Path.home(),
-        Path("/"),
-        Path("C:\\") if IS_WINDOWS else None,
-        Path("/usr"),
-        Path("/etc"),
-        Path("/bin"),
-        Path("/sbin")
-    ]
-
-    for critical in filter(None, critical_paths):
-        try:
-            normalized_path = path.resolve()
-            normalized_critical = critical.resolve()
-            if (normalized_path == normalized_critical or
-                    normalized_critical in normalized_path.parents):
-                return False
-        except (OSError, ValueError):
-            # Path comparison failed, reject for safety
-            return False
+    normalized_path = os.path.normcase(path_str)
+    if (normalized_path in _CRITICAL_PATHS or
+            normalized_path.startswith(_CRITICAL_PREFIXES)):
+        return False
 
     # Check against allowed patterns
-    path_str = str(path)
     is_allowed = any(pattern in path_str for pattern in allowed_patterns)
 
     return is_allowed
 
 
-def safe_framework_cleanup():
-    """Secure cleanup of Arduino Framework with enhanced error handling"""
-    success = True
+def _cleanup_framework_dir(name, dir_path):
+    """Removes a single framework directory, returns False on failure"""
+    try:
+        dir_stat = os.lstat(dir_path)
+    except OSError:
+        # Nothing to remove
+        return True
+
+    if validate_platformio_path(dir_path):
+        if not safe_delete_directory(dir_path, dir_stat):
+            print(f"Error removing {name}")
+            return False
 
-    # Framework directory cleanup
-    if exists(FRAMEWORK_DIR):
-        if validate_platformio_path(FRAMEWORK_DIR):
-            if not safe_delete_directory(FRAMEWORK_DIR):
-                print("Error removing framework")
-                success = False
+    return True
 
-    # Framework libs directory cleanup
-    if exists(FRAMEWORK_LIB_DIR):
-        if validate_platformio_path(FRAMEWORK_LIB_DIR):
-            if not safe_delete_directory(FRAMEWORK_LIB_DIR):
-                print("Error removing framework libs")
-                success = False
 
-    return success
+def safe_framework_cleanup():
+    """Secure cleanup of Arduino Framework with enhanced error handling"""
+    # Both directories are always processed, even if the first one fails
+    framework_ok = _cleanup_framework_dir("framework", FRAMEWORK_DIR)
+    framework_libs_ok = _cleanup_framework_dir("framework libs",
+                                               FRAMEWORK_LIB_DIR)
+    return framework_ok and framework_libs_ok
 
 
 def safe_remove_sdkconfig_files():
     """Secure removal of SDKConfig files"""
-    envs = [section.replace("env:", "") for section in config.sections()
-            if section.startswith("env:")]
-    for env_name in envs:
-        file_path = join(project_dir, f"sdkconfig.{env_name}")
-        if exists(file_path):
-            safe_delete_file(file_path)
+    envs = {section[4:] for section in config.sections()
+            if section.startswith("env:")}
+    prefix = "sdkconfig."
+    # One directory scan instead of a stat call per environment
+    try:
+        with os.scandir(project_dir) as entries:
+            for entry in entries:
+                name = entry.name
+                if (name.startswith(prefix) and name[len(prefix):] in envs
+                        and entry.is_file()):
+                    safe_delete_file(entry.path)
+    except OSError:
+        return
 
 
 # Initialization
@@ -553,11 +652,14 @@ if config.has_option(current_env_section, "custom_sdkconfig"):
 if board_sdkconfig:
     flag_custom_sdkconfig = True
 
+# "-D" is a flag prefix, strip it per token instead of rescanning the string
 extra_flags_raw = board.get("build.extra_flags", [])
-if isinstance(extra_flags_raw, list):
-    extra_flags = " ".join(extra_flags_raw).replace("-D", " ")
-else:
-    extra_flags = str(extra_flags_raw).replace("-D", " ")
+if not isinstance(extra_flags_raw, list):
+    extra_flags_raw = str(extra_flags_raw).split()
+extra_flags = " ".join(
+    flag[2:] if flag.startswith("-D") else flag
+    for flag in map(str, extra_flags_raw)
+)
 
 framework_reinstall = False
 
@@ -566,15 +668,17 @@ FRAMEWORK_LIB_DIR = path_cache.framework_lib_dir
 
 SConscript("_embed_files.py", exports="env")
 
-flag_any_custom_sdkconfig = exists(join(
-    platform.get_package_dir("framework-arduinoespressif32-libs"),
-    "sdkconfig"))
+flag_any_custom_sdkconfig = exists(join(FRAMEWORK_LIB_DIR, "sdkconfig"))
 
 
+@functools.lru_cache(maxsize=None)
 def has_unicore_flags():
     """Check if any UNICORE flags are present in configuration"""
-    return any(flag in extra_flags or flag in entry_custom_sdkconfig
-               or flag in board_sdkconfig for flag in UNICORE_FLAGS)
+    search = UNICORE_FLAGS_RE.search
+    board_entries = (board_sdkconfig if isinstance(board_sdkconfig, str)
+                     else "\n".join(board_sdkconfig))
+    return any(search(source) is not None for source in
+               (extra_flags, entry_custom_sdkconfig, board_entries))
 
 
 # Esp32-solo1 libs settings
@@ -588,10 +692,31 @@ if flag_custom_sdkconfig and has_unicore_flags():
     env.Replace(BUILD_UNFLAGS=new_build_unflags)
 
 
+# BLAKE2b state pre-seeded with the MCU name, cloned for every checksum
+_MCU_HASHER = hashlib.blake2b(digest_size=8)
+_MCU_HASHER.update(mcu.encode('utf-8'))
+
+
+def get_sdkconfig_hash(phrase):
+    """Short checksum of a custom sdkconfig for the current MCU"""
+    hasher = _MCU_HASHER.copy()
+    hasher.update(phrase.encode('utf-8'))
+    return hasher.hexdigest()
+
+
 def get_MD5_hash(phrase):
+    """Legacy checksum, still accepted for existing sdkconfig.defaults"""
     return hashlib.md5(phrase.encode('utf-8')).hexdigest()[:16]
 
 
+@functools.lru_cache(maxsize=None)
+def get_expected_sdkconfig_hashes():
+    """Checksums accepted for the current custom sdkconfig (computed once)"""
+    custom_options = entry_custom_sdkconfig.strip()
+    return (get_sdkconfig_hash(custom_options),
+            get_MD5_hash(custom_options + mcu))
+
+
 def matching_custom_sdkconfig():
     """Checks if current environment matches existing sdkconfig"""
     cust_sdk_is_present = False
@@ -607,15 +732,18 @@ def matching_custom_sdkconfig():
         return False, cust_sdk_is_present
 
     try:
-        with open(last_sdkconfig_path) as src:
-            line = src.readline()
-            if line.startswith("# TASMOTA__"):
-                cust_sdk_is_present = True
-                custom_options = entry_custom_sdkconfig
-                expected_hash = get_MD5_hash(custom_options.strip() + mcu)
-                if line.split("__")[1].strip() == expected_hash:
-                    return True, cust_sdk_is_present
-    except (IOError, IndexError):
+        # The checksum marker fits in the first bytes, a raw read is enough
+        fd = os.open(last_sdkconfig_path, os.O_RDONLY)
+        try:
+            head = os.read(fd, 64)
+        finally:
+            os.close(fd)
+        if head.startswith(b"# TASMOTA__"):
+            cust_sdk_is_present = True
+            found_hash = head.split(b"__", 2)[1].split(b"\n", 1)[0]
+            if found_hash.strip().decode() in get_expected_sdkconfig_hashes():
+                return True, cust_sdk_is_present
+    except (IOError, IndexError, UnicodeDecodeError):
         pass
 
     return False, cust_sdk_is_present
@@ -641,33 +769,43 @@ def call_compile_libs():
 
 
 FRAMEWORK_SDK_DIR = path_cache.sdk_dir
+IPREFIX_FLAG_LENGTH = len(f"-iprefix{FRAMEWORK_SDK_DIR}")
 IS_INTEGRATION_DUMP = env.IsIntegrationDump()
 
 
+# Normalized drive and prefix of the framework SDK directory
+_SDK_DRIVE, _SDK_REST = splitdrive(
+    os.path.normcase(os.path.normpath(FRAMEWORK_SDK_DIR)))
+_SDK_PREFIX = _SDK_REST.rstrip("\\/") + os.sep
+
+
+@functools.lru_cache(maxsize=4096)
 def is_framework_subfolder(potential_subfolder):
     """Check if a path is a subfolder of the framework SDK directory"""
     # carefully check before change this function
     if not isabs(potential_subfolder):
         return False
-    if (splitdrive(FRAMEWORK_SDK_DIR)[0] !=
-            splitdrive(potential_subfolder)[0]):
-        return False
-    return (commonpath([FRAMEWORK_SDK_DIR]) ==
-            commonpath([FRAMEWORK_SDK_DIR, potential_subfolder]))
+    drive, rest = splitdrive(
+        os.path.normcase(os.path.normpath(potential_subfolder)))
+    return (drive == _SDK_DRIVE and
+            (rest + os.sep).startswith(_SDK_PREFIX))
 
 
-# Performance optimization with caching
-def calculate_include_path_length(includes):
-    """Calculate total character count of all include paths with caching"""
-    if not hasattr(calculate_include_path_length, '_cache'):
-        calculate_include_path_length._cache = {}
+# Per-entry include path length cache (SCons nodes and strings are hashable)
+_INC_LEN_CACHE = {}
 
-    cache_key = tuple(includes)
-    if cache_key not in calculate_include_path_length._cache:
-        calculate_include_path_length._cache[cache_key] = sum(
-            len(str(inc)) for inc in includes)
 
-    return calculate_include_path_length._cache[cache_key]
+def calculate_include_path_length(includes):
+    """Calculate total character count of all include paths with caching"""
+    cache = _INC_LEN_CACHE
+    get_cached = cache.get
+    total = 0
+    for inc in includes:
+        length = get_cached(inc)
+        if length is None:
+            length = cache[inc] = len(str(inc))
+        total += length
+    return total
 
 
 def analyze_path_distribution(includes):
@@ -676,21 +814,33 @@ def analyze_path_distribution(includes):
     if not includes:
         return {}
 
-    lengths = [len(str(inc)) for inc in includes]
-    framework_lengths = [len(str(inc)) for inc in includes
-                         if is_framework_subfolder(inc)]
+    # Single pass over the include list collecting all statistics
+    count = total_length = max_length = 0
+    min_length = None
+    framework_count = framework_total_length = 0
+
+    for inc in includes:
+        length = len(str(inc))
+        count += 1
+        total_length += length
+        if length > max_length:
+            max_length = length
+        if min_length is None or length < min_length:
+            min_length = length
+        if is_framework_subfolder(inc):
+            framework_count += 1
+            framework_total_length += length
 
     return {
-        'total_paths': len(includes),
-        'total_length': sum(lengths),
-        'average_length': sum(lengths) / len(lengths),
-        'max_length': max(lengths),
-        'min_length': min(lengths),
-        'framework_paths': len(framework_lengths),
-        'framework_total_length': sum(framework_lengths),
-        'framework_avg_length': (sum(framework_lengths) /
-                                 len(framework_lengths)
-                                 if framework_lengths else 0)
+        'total_paths': count,
+        'total_length': total_length,
+        'average_length': total_length / count,
+        'max_length': max_length,
+        'min_length': min_length,
+        'framework_paths': framework_count,
+        'framework_total_length': framework_total_length,
+        'framework_avg_length': (framework_total_length / framework_count
+                                 if framework_count else 0)
     }
 
 
@@ -699,44 +849,49 @@ def debug_framework_paths(env, include_count, total_length):
     if not env.get("VERBOSE"):
         return
 
-    print("*** Debug Framework Paths ***")
-    print(f"*** MCU: {mcu} ***")
-    print(f"*** FRAMEWORK_DIR: {FRAMEWORK_DIR} ***")
-    print(f"*** FRAMEWORK_SDK_DIR: {FRAMEWORK_SDK_DIR} ***")
-    print(f"*** SDK exists: {exists(FRAMEWORK_SDK_DIR)} ***")
-    print(f"*** Include count: {include_count} ***")
-    print(f"*** Total path length: {total_length} ***")
+    # Collect all lines and emit them with a single write
+    lines = [
+        "*** Debug Framework Paths ***",
+        f"*** MCU: {mcu} ***",
+        f"*** FRAMEWORK_DIR: {FRAMEWORK_DIR} ***",
+        f"*** FRAMEWORK_SDK_DIR: {FRAMEWORK_SDK_DIR} ***",
+        f"*** SDK exists: {exists(FRAMEWORK_SDK_DIR)} ***",
+        f"*** Include count: {include_count} ***",
+        f"*** Total path length: {total_length} ***",
+    ]
 
     includes = env.get("CPPPATH", [])
     framework_count = 0
     longest_paths = sorted(includes, key=len, reverse=True)[:5]
 
-    print("*** Longest include paths: ***")
+    lines.append("*** Longest include paths: ***")
     for i, inc in enumerate(longest_paths):
         is_fw = is_framework_subfolder(inc)
         if is_fw:
             framework_count += 1
-        print(f"***   {i+1}: {inc} (length: {len(str(inc))}) -> "
-              f"Framework: {is_fw} ***")
+        lines.append(f"***   {i+1}: {inc} (length: {len(str(inc))}) -> "
+                     f"Framework: {is_fw} ***")
 
-    print(f"*** Framework includes found: {framework_count}/"
-          f"{len(includes)} ***")
+    lines.append(f"*** Framework includes found: {framework_count}/"
+                 f"{len(includes)} ***")
 
     # Show path distribution analysis
     analysis = analyze_path_distribution(includes)
-    print(f"*** Path Analysis: Avg={analysis.get('average_length', 0):.1f}, "
-          f"Max={analysis.get('max_length', 0)}, "
-          f"Framework Avg={analysis.get('framework_avg_length', 0):.1f} ***")
+    lines.append(
+        f"*** Path Analysis: Avg={analysis.get('average_length', 0):.1f}, "
+        f"Max={analysis.get('max_length', 0)}, "
+        f"Framework Avg={analysis.get('framework_avg_length', 0):.1f} ***")
+    print("\n".join(lines))
 
 
 def apply_include_shortening(env, node, includes, total_length):
     """Applies include path shortening technique"""
-    env_get = env.get
     to_unix_path = fs.to_unix_path
+    is_framework = is_framework_subfolder
+    sdk_dir = FRAMEWORK_SDK_DIR
     ccflags = env["CCFLAGS"]
     asflags = env["ASFLAGS"]
 
-    includes = [to_unix_path(inc) for inc in env_get("CPPPATH", [])]
     shortened_includes = []
     generic_includes = []
 
@@ -744,17 +899,16 @@ def apply_include_shortening(env, node, includes, total_length):
     saved_chars = 0
 
     for inc in includes:
-        if is_framework_subfolder(inc):
-            relative_path = to_unix_path(relpath(inc, FRAMEWORK_SDK_DIR))
-            shortened_path = "-iwithprefix/" + relative_path
+        inc = to_unix_path(inc)
+        if is_framework(inc):
+            shortened_path = ("-iwithprefix/" +
+                              to_unix_path(relpath(inc, sdk_dir)))
             shortened_includes.append(shortened_path)
 
             # Calculate character savings
-            # Original: full path in -I flag
+            # Original: full path in -I flag (2 chars for "-I")
             # New: -iprefix + shortened relative path
-            original_chars = len(f"-I{inc}")
-            new_chars = len(shortened_path)
-            saved_chars += max(0, original_chars - new_chars)
+            saved_chars += max(0, len(inc) + 2 - len(shortened_path))
         else:
             generic_includes.append(inc)
 
@@ -765,8 +919,7 @@ def apply_include_shortening(env, node, includes, total_length):
                 # Each -I is 2 chars
                 removed_i_flags = len(shortened_includes) * 2
                 new_total_length = (original_length - saved_chars +
-                                    len(f"-iprefix{FRAMEWORK_SDK_DIR}") -
-                                    removed_i_flags)
+                                    IPREFIX_FLAG_LENGTH - removed_i_flags)
                 print(f"*** Applied include path shortening for "
                       f"{len(shortened_includes)} framework paths ***")
                 print(f"*** Path length reduced from {original_length} to "
@@ -795,6 +948,12 @@ def apply_include_shortening(env, node, includes, total_length):
     )
 
 
+@functools.lru_cache(maxsize=None)
+def get_build_include_path_threshold():
+    """Include path threshold of the current build (resolved once)"""
+    return get_include_path_threshold(env, config, current_env_section)
+
+
 def smart_include_length_shorten(env, node):
     """
     Include path shortening based on max. performance configurable threshold 
@@ -808,39 +967,44 @@ def smart_include_length_shorten(env, node):
         return env.Object(node)
 
     # Get dynamically configurable bleeding edge threshold
-    include_path_threshold = get_include_path_threshold(env, config,
-                                                        current_env_section)
+    include_path_threshold = get_build_include_path_threshold()
 
     check_and_warn_long_path_support()
 
     includes = env.get("CPPPATH", [])
-    include_count = len(includes)
     total_path_length = calculate_include_path_length(includes)
 
     # Debug information in verbose mode
     if env.get("VERBOSE"):
+        include_count = len(includes)
         debug_framework_paths(env, include_count, total_path_length)
 
         # Extended debug information about maximum edge threshold 
         # configuration
         threshold_info = get_threshold_info(env, config, current_env_section)
-        print("*** Maximum Threshold Configuration Debug ***")
-        print(f"***   MCU: {threshold_info['mcu']} ***")
-        print(f"***   Maximum Platform Default: "
-              f"{threshold_info['platform_default']} ***")
-        print(f"***   Final maximum Threshold: "
-              f"{threshold_info['final_threshold']} ***")
-        print(f"***   Source: {threshold_info['source']} ***")
-        print("***   Performance Mode: Maximum Aggressive ***")
+        lines = [
+            "*** Maximum Threshold Configuration Debug ***",
+            f"***   MCU: {threshold_info['mcu']} ***",
+            f"***   Maximum Platform Default: "
+            f"{threshold_info['platform_default']} ***",
+            f"***   Final maximum Threshold: "
+            f"{threshold_info['final_threshold']} ***",
+            f"***   Source: {threshold_info['source']} ***",
+            "***   Performance Mode: Maximum Aggressive ***",
+        ]
         if threshold_info['env_variable']:
-            print(f"***   Env Variable: {threshold_info['env_variable']} ***")
+            lines.append(
+                f"***   Env Variable: {threshold_info['env_variable']} ***")
         if threshold_info['env_specific']:
-            print(f"***   Env Specific: {threshold_info['env_specific']} ***")
+            lines.append(
+                f"***   Env Specific: {threshold_info['env_specific']} ***")
         if threshold_info['global_env']:
-            print(f"***   Global Env: {threshold_info['global_env']} ***")
+            lines.append(
+                f"***   Global Env: {threshold_info['global_env']} ***")
         if threshold_info['platformio_section']:
-            print(f"***   PlatformIO Section: "
-                  f"{threshold_info['platformio_section']} ***")
+            lines.append(f"***   PlatformIO Section: "
+                         f"{threshold_info['platformio_section']} ***")
+        print("\n".join(lines))
 
     # Use the configurable and validated bleeding edge threshold
     if total_path_length <= include_path_threshold:
@@ -8,15 +8,274 @@ allowing developers to add or remove specific components and handle library
 dependencies efficiently.
 """
 
+import copy
+import functools
+import hashlib
+import json
 import os
 import shutil
 import re
-import yaml
-from yaml import SafeLoader
+import sys
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
 from os.path import join
+from types import MappingProxyType
 from typing import Set, Optional, Dict, Any, List, Tuple
 
 
+@functools.lru_cache(maxsize=None)
+def _load_yaml():
+    """
+    Import PyYAML on first use.
+    
+    Most builds never touch idf_component.yml, so the import is deferred
+    until a component file is actually loaded or saved. The libyaml C
+    bindings are preferred, with a fallback to the pure Python classes.
+    
+    Returns:
+        Tuple of (yaml module, SafeLoader class, SafeDumper class)
+    """
+    import yaml
+    try:
+        from yaml import CSafeLoader as SafeLoader, CSafeDumper as SafeDumper
+    except ImportError:
+        from yaml import SafeLoader, SafeDumper
+    return yaml, SafeLoader, SafeDumper
+
+
+def _link_or_copy(src: str, dst: str) -> None:
+    """
+    Create a backup of src as a hard link, copying only if linking fails.
+    
+    A hard link costs no data copy. It is only safe for files that are
+    replaced rather than rewritten in place, like pioarduino-build.py
+    which BuildFileManager writes through os.replace.
+    
+    Args:
+        src: Path of the file to back up
+        dst: Path of the backup
+    """
+    try:
+        os.link(src, dst)
+    except OSError:
+        # Cross-device, unsupported filesystem or missing permission
+        shutil.copy2(src, dst)
+
+
+# Arduino library mappings keyed by (libraries dir, dir mtime), shared by
+# all ComponentManager instances of the build process
+_ARDUINO_LIBRARIES_CACHE: Dict[Tuple[str, int], Dict[str, str]] = {}
+
+
+# Include path patterns matching pioarduino-build.py entries, {name} is
+# replaced with a capture group of escaped library or component names.
+# Every pattern is anchored at a line start and cannot cross a newline,
+# so a match always covers exactly one complete line. The first
+# _CPPPATH_PATTERN_COUNT patterns are also used for the CPPPATH entries
+# of removed components.
+_INCLUDE_PATTERN_TEMPLATES = (
+    r'^[^\n]*join\([^,\n]*,[^\S\n]*"include",[^\S\n]*"{name}"[^)\n]*\),?\n',
+    r'^[^\n]*"include/{name}"[^,\n]*,?\n',
+    r'^[^\n]*"[^"\n]*include[^"\n]*{name}[^"\n]*"[^,\n]*,?\n',
+    r'^[^\n]*"[^"\n]*/{name}/include[^"\n]*"[^,\n]*,?\n',
+    r'^[^\n]*"[^"\n]*{name}[^"\n]*include[^"\n]*"[^,\n]*,?\n',
+    r'^[^\n]*join\([^)\n]*"include"[^)\n]*"{name}"[^)\n]*\),?\n',
+    r'^[^\n]*"{name}/include"[^,\n]*,?\n',
+    r'^[^\S\n]*"[^"\n]*/{name}/[^"\n]*",?\n'
+)
+_CPPPATH_PATTERN_COUNT = 3
+
+
+@functools.lru_cache(maxsize=64)
+def _combined_include_pattern(names: Tuple[str, ...],
+                              template_count: int = len(_INCLUDE_PATTERN_TEMPLATES)) -> re.Pattern:
+    """
+    Compile the include path templates for several names into one regex.
+    
+    Every template gets the alternation of all names as its only capture
+    group, and the templates are joined into a single alternation. One
+    scan of the build file then replaces a pass per template and name,
+    and match.group(match.lastindex) tells which name an entry belongs to.
+    
+    Args:
+        names: Library or component names as they appear in include paths
+        template_count: Number of leading templates to use
+        
+    Returns:
+        Compiled combined pattern
+    """
+    # Longer names first so a name is not shadowed by one of its prefixes
+    ordered = sorted(names, key=lambda name: (-len(name), name))
+    names_alt = "(" + "|".join(re.escape(name) for name in ordered) + ")"
+    return re.compile("|".join(
+        template.format(name=names_alt) for template in _INCLUDE_PATTERN_TEMPLATES[:template_count]
+    ), re.MULTILINE)
+
+
+# Number of buffered log lines written to stdout in one go
+_LOG_FLUSH_THRESHOLD = 32
+
+# Bytes read up front when looking for the name of a library.properties file
+_PROPERTIES_HEAD_SIZE = 2048
+_PROPERTIES_NAME_RE = re.compile(rb'^name=(.*)$', re.MULTILINE)
+
+# Library name fragments identifying Bluetooth/BLE related libraries
+_BT_RELATED_NAMES = (
+    'BT',
+    'BLE',
+    'BLUETOOTH',
+    'NIMBLE',
+    'ESP32_BLE',
+    'ESP32BLE',
+    'BLUETOOTHSERIAL',
+    'BLE_ARDUINO',
+    'ESP_BLE',
+    'ESP_BT'
+)
+# Single alternation so one scan checks all fragments at once
+_BT_RELATED_NAMES_RE = re.compile("|".join(map(re.escape, _BT_RELATED_NAMES)))
+
+# lib_deps keywords indicating that the project needs Bluetooth/BLE
+_BT_BLE_KEYWORDS = ('BLE', 'BT', 'NIMBLE', 'BLUETOOTH')
+_BT_BLE_KEYWORDS_RE = re.compile("|".join(map(re.escape, _BT_BLE_KEYWORDS)))
+
+# Extended mapping of Arduino library names to ESP-IDF include paths
+_EXTENDED_MAPPING = MappingProxyType({
+    # Core ESP32 mappings
+    'wifi': 'esp_wifi',
+    'bluetooth': 'bt',
+    'bluetoothserial': 'bt',
+    'ble': 'bt',
+    'bt': 'bt',
+    'ethernet': 'esp_eth',
+    'websocket': 'esp_websocket_client',
+    'http': 'esp_http_client',
+    'https': 'esp_https_ota',
+    'ota': 'esp_https_ota',
+    'spiffs': 'spiffs',
+    'fatfs': 'fatfs',
+    'mesh': 'esp_wifi_mesh',
+    'smartconfig': 'esp_smartconfig',
+    'mdns': 'mdns',
+    'coap': 'coap',
+    'mqtt': 'mqtt',
+    'json': 'cjson',
+    'mbedtls': 'mbedtls',
+    'openssl': 'openssl',
+
+    # Arduino Core specific mappings (safe mappings that don't conflict with critical components)
+    'esp32blearduino': 'bt',
+    'esp32_ble_arduino': 'bt',
+    'esp32': 'esp32',
+    'wire': 'driver',
+    'spi': 'driver',
+    'i2c': 'driver',
+    'uart': 'driver',
+    'serial': 'driver',
+    'analogwrite': 'driver',
+    'ledc': 'driver',
+    'pwm': 'driver',
+    'dac': 'driver',
+    'adc': 'driver',
+    'touch': 'driver',
+    'hall': 'driver',
+    'rtc': 'driver',
+    'timer': 'esp_timer',
+    'preferences': 'arduino_preferences',
+    'eeprom': 'arduino_eeprom',
+    'update': 'esp_https_ota',
+    'httpupdate': 'esp_https_ota',
+    'httpclient': 'esp_http_client',
+    'httpsclient': 'esp_https_ota',
+    'wifimanager': 'esp_wifi',
+    'wificlientsecure': 'esp_wifi',
+    'wifiserver': 'esp_wifi',
+    'wifiudp': 'esp_wifi',
+    'wificlient': 'esp_wifi',
+    'wifiap': 'esp_wifi',
+    'wifimulti': 'esp_wifi',
+    'esp32webserver': 'esp_http_server',
+    'webserver': 'esp_http_server',
+    'asyncwebserver': 'esp_http_server',
+    'dnsserver': 'lwip',
+    'netbios': 'netbios',
+    'simpletime': 'lwip',
+    'fs': 'vfs',
+    'sd': 'fatfs',
+    'sd_mmc': 'fatfs',
+    'littlefs': 'esp_littlefs',
+    'ffat': 'fatfs',
+    'camera': 'esp32_camera',
+    'esp_camera': 'esp32_camera',
+    'arducam': 'esp32_camera',
+    'rainmaker': 'esp_rainmaker',
+    'esp_rainmaker': 'esp_rainmaker',
+    'provisioning': 'wifi_provisioning',
+    'wifiprovisioning': 'wifi_provisioning',
+    'espnow': 'esp_now',
+    'esp_now': 'esp_now',
+    'esptouch': 'esp_smartconfig',
+    'ping': 'lwip',
+    'netif': 'lwip',
+    'tcpip': 'lwip'
+})
+
+# Direct mapping for common cases not in Arduino libraries
+_DIRECT_MAPPING = MappingProxyType({
+    'ble': 'bt',
+    'bluetooth': 'bt',
+    'bluetoothserial': 'bt'
+})
+
+# Critical ESP32 components that should never be ignored
+_CRITICAL_COMPONENTS = frozenset({
+    'lwip',           # Network stack
+    'freertos',       # Real-time OS
+    'esp_system',     # System functions
+    'esp_common',     # Common ESP functions
+    'driver',         # Hardware drivers
+    'nvs_flash',      # Non-volatile storage
+    'spi_flash',      # Flash memory access
+    'esp_timer',      # Timer functions
+    'esp_event',      # Event system
+    'log'             # Logging system
+})
+
+# DSP components that are never removed from the build script
+_DSP_PROTECTED_COMPONENTS = frozenset({'dsp', 'esp_dsp', 'dsps', 'fft2r', 'dsps_fft2r'})
+
+# Default idf_component.yml content, identical to the yaml.dump output
+_DEFAULT_COMPONENT_YML = "dependencies:\n  idf: '>=5.1'\n"
+
+# Bump when the way library names are mapped to include paths changes
+_LIBRARY_MAPPING_CACHE_SCHEMA = 1
+
+
+@functools.lru_cache(maxsize=None)
+def _library_mapping_cache_version() -> str:
+    """
+    Identify the mapping rules the on-disk library mapping was built with.
+    
+    The cached mapping holds values derived from _EXTENDED_MAPPING, so a
+    platform update changing the table must not reuse an older cache.
+    
+    Returns:
+        Schema number combined with a digest of _EXTENDED_MAPPING
+    """
+    digest = hashlib.blake2b(
+        json.dumps(dict(_EXTENDED_MAPPING), sort_keys=True).encode("utf-8"), digest_size=8
+    ).hexdigest()
+    return f"{_LIBRARY_MAPPING_CACHE_SCHEMA}-{digest}"
+
+
+# Normalizes library names to _EXTENDED_MAPPING keys in a single pass
+_LIB_KEY_TRANS = str.maketrans({' ': '', '-': '_'})
+
+# Common library name prefixes and suffixes, stripped in this order
+_PREFIXES_TO_REMOVE = ('lib', 'arduino-', 'esp32-', 'esp-')
+_SUFFIXES_TO_REMOVE = ('-lib', '-library', '.h')
+
+
 class ComponentManagerConfig:
     """
     Handles configuration and environment setup for component management.
@@ -51,6 +310,46 @@ class ComponentManagerConfig:
         self.arduino_framework_dir = self.platform.get_package_dir("framework-arduinoespressif32")
         # Get MCU-specific Arduino libraries directory
         self.arduino_libs_mcu = join(self.platform.get_package_dir("framework-arduinoespressif32-libs"), self.mcu)
+        # Arduino build script and its MCU-specific backup
+        self.build_py_path = join(self.arduino_libs_mcu, "pioarduino-build.py")
+        self.build_py_backup_path = join(self.arduino_libs_mcu, f"pioarduino-build.py.{self.mcu}")
+        # Whether the Arduino framework is active (resolved on first use)
+        self._arduino_active: Optional[bool] = None
+        # Project option values resolved through the SCons environment
+        self._project_options: Dict[str, Any] = {}
+    
+    def get_project_option(self, name: str, default: Any = None) -> Any:
+        """
+        Get a project option of the current environment, cached per name.
+        
+        Project options don't change during a build, so each option is
+        looked up through env.GetProjectOption only once.
+        
+        Args:
+            name: Option name from platformio.ini
+            default: Value returned when the option is not set
+            
+        Returns:
+            Option value or the given default
+        """
+        if name not in self._project_options:
+            self._project_options[name] = self.env.GetProjectOption(name, default)
+        return self._project_options[name]
+    
+    @property
+    def arduino_active(self) -> bool:
+        """
+        Check whether the Arduino framework is part of the build.
+        
+        The $PIOFRAMEWORK substitution is evaluated only once per
+        configuration instance.
+        
+        Returns:
+            True if "arduino" is among the configured frameworks
+        """
+        if self._arduino_active is None:
+            self._arduino_active = "arduino" in self.env.subst("$PIOFRAMEWORK")
+        return self._arduino_active
 
 
 class ComponentLogger:
@@ -69,22 +368,38 @@ class ComponentLogger:
         Sets up internal data structures for tracking component changes
         and modifications made during the build process.
         """
-        # List to store all change messages for summary reporting
-        self.component_changes: List[str] = []
+        # Deque to store all change messages for summary reporting
+        self.component_changes: deque[str] = deque()
+        # Pending console lines, written in batches to save stdout writes
+        self._buf: List[str] = []
     
     def log_change(self, message: str) -> None:
         """
-        Log a change message with immediate console output.
+        Log a change message with buffered console output.
         
         Records the change message internally for summary reporting and
-        immediately prints it to the console with a component manager prefix
-        for real-time feedback during build operations.
+        queues it for the console with a component manager prefix. Queued
+        lines are written in batches of _LOG_FLUSH_THRESHOLD and on an explicit
+        flush(), which ComponentManager calls at the end of each operation.
         
         Args:
             message: Descriptive message about the change or operation performed
         """
         self.component_changes.append(message)
-        print(f"[ComponentManager] {message}")
+        self._buf.append(f"[ComponentManager] {message}\n")
+        if len(self._buf) >= _LOG_FLUSH_THRESHOLD:
+            self.flush()
+    
+    def flush(self) -> None:
+        """
+        Write all pending log lines to stdout with a single write call.
+        
+        Safe to call repeatedly; does nothing when no lines are pending.
+        """
+        if self._buf:
+            sys.stdout.write("".join(self._buf))
+            self._buf.clear()
+            sys.stdout.flush()
     
     def get_changes_summary(self) -> List[str]:
         """
@@ -96,7 +411,7 @@ class ComponentLogger:
         Returns:
             List of change messages in chronological order
         """
-        return self.component_changes.copy()
+        return list(self.component_changes)
     
     def print_changes_summary(self) -> None:
         """
@@ -106,6 +421,7 @@ class ComponentLogger:
         were made, or a simple message indicating no changes occurred.
         Useful for end-of-build reporting and debugging.
         """
+        self.flush()
         if self.component_changes:
             print("\n=== Component Manager Changes ===")
             for change in self.component_changes:
@@ -115,6 +431,90 @@ class ComponentLogger:
             print("[ComponentManager] No changes made")
 
 
+class BuildFileManager:
+    """
+    Session-wide in-memory copy of the Arduino pioarduino-build.py script.
+    
+    Component cleanup and lib_ignore processing both rewrite the same build
+    script. Sharing one loaded copy lets all handlers apply their changes in
+    memory, and the file is written back once when the session is flushed.
+    """
+    
+    def __init__(self, config: ComponentManagerConfig, logger: ComponentLogger):
+        """
+        Initialize the build file manager without touching the file.
+        
+        Args:
+            config: Configuration manager instance providing access to paths
+            logger: Logger instance for reporting write errors
+        """
+        self.config = config
+        self.logger = logger
+        self.build_py_path = config.build_py_path
+        # Loaded content and whether it differs from the file on disk
+        self._content: Optional[str] = None
+        self._dirty = False
+    
+    def exists(self) -> bool:
+        """
+        Check whether the build script exists.
+        
+        Returns:
+            True if pioarduino-build.py exists for the current MCU
+        """
+        return self._content is not None or os.path.exists(self.build_py_path)
+    
+    def load(self) -> str:
+        """
+        Get the build script content, reading the file on first access.
+        
+        Returns:
+            Current (possibly modified) build script content
+            
+        Raises:
+            OSError: If the build script cannot be read
+        """
+        if self._content is None:
+            with open(self.build_py_path, 'r', encoding='utf-8') as f:
+                self._content = f.read()
+        return self._content
+    
+    def update(self, content: str) -> None:
+        """
+        Replace the in-memory build script content.
+        
+        Args:
+            content: New build script content
+        """
+        if content != self._content:
+            self._content = content
+            self._dirty = True
+    
+    def flush(self) -> None:
+        """
+        Write pending changes back to pioarduino-build.py.
+        
+        The content is written to a temporary file that atomically replaces
+        the build script, so an interrupted build never leaves a truncated
+        script behind. Does nothing if the content was not modified since
+        the last flush.
+        """
+        if not self._dirty:
+            return
+        
+        # The backup may be a hard link to this file (see _link_or_copy).
+        # Never write the build script in place: an in-place write would
+        # change the backup too. Always write a new file and os.replace it.
+        tmp_path = self.build_py_path + ".tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(self._content)
+            os.replace(tmp_path, self.build_py_path)
+            self._dirty = False
+        except OSError as e:
+            self.logger.log_change(f"Error writing build file: {str(e)}")
+
+
 class ComponentHandler:
     """
     Handles IDF component addition and removal operations.
@@ -124,7 +524,7 @@ class ComponentHandler:
     component validation, and cleanup operations.
     """
     
-    def __init__(self, config: ComponentManagerConfig, logger: ComponentLogger):
+    def __init__(self, config: ComponentManagerConfig, logger: ComponentLogger, build_file: BuildFileManager):
         """
         Initialize the component handler with configuration and logging.
         
@@ -135,9 +535,11 @@ class ComponentHandler:
         Args:
             config: Configuration manager instance providing access to paths and settings
             logger: Logger instance for recording component operations
+            build_file: Shared in-memory build script modified by the handler
         """
         self.config = config
         self.logger = logger
+        self.build_file = build_file
         # Track removed components for cleanup operations
         self.removed_components: Set[str] = set()
     
@@ -153,27 +555,41 @@ class ComponentHandler:
             add_components: Whether to process component additions from custom_component_add
             remove_components: Whether to process component removals from custom_component_remove
         """
+        # Check if env and GetProjectOption are available
+        if not (hasattr(self.config, 'env') and hasattr(self.config.env, 'GetProjectOption')):
+            return
+        
+        # Nothing to add or remove: leave idf_component.yml and the build
+        # script alone (the Arduino builder calls this for lib_ignore only)
+        add_components = add_components and bool(
+            self.config.get_project_option("custom_component_add", None))
+        remove_components = remove_components and bool(
+            self.config.get_project_option("custom_component_remove", None))
+        if not add_components and not remove_components:
+            return
+        
         # Create backup before first component removal and on every add of a component
         if remove_components and not self.removed_components or add_components:
             self._backup_pioarduino_build_py()
             self.logger.log_change("Created backup of build file")
         
-        # Check if env and GetProjectOption are available
-        if hasattr(self.config, 'env') and hasattr(self.config.env, 'GetProjectOption'):
-            component_yml_path = self._get_or_create_component_yml()
-            component_data = self._load_component_yml(component_yml_path)
-            
-            if remove_components:
-                self._process_component_removals(component_data)
-            
-            if add_components:
-                self._process_component_additions(component_data)
-            
+        component_yml_path = self._get_or_create_component_yml()
+        component_data = self._load_component_yml(component_yml_path)
+        original_data = copy.deepcopy(component_data)
+        
+        if remove_components:
+            self._process_component_removals(component_data)
+        
+        if add_components:
+            self._process_component_additions(component_data)
+        
+        # Only serialize and rewrite the file if the data changed
+        if component_data != original_data:
             self._save_component_yml(component_yml_path, component_data)
-            
-            # Clean up removed components
-            if self.removed_components:
-                self._cleanup_removed_components()
+        
+        # Clean up removed components
+        if self.removed_components:
+            self._cleanup_removed_components()
     
     def _process_component_removals(self, component_data: Dict[str, Any]) -> None:
         """
@@ -187,7 +603,7 @@ class ComponentHandler:
             component_data: Component configuration data dictionary containing dependencies
         """
         try:
-            remove_option = self.config.env.GetProjectOption("custom_component_remove", None)
+            remove_option = self.config.get_project_option("custom_component_remove", None)
             if remove_option:
                 # Split multiline option into individual components
                 components_to_remove = remove_option.splitlines()
@@ -207,7 +623,7 @@ class ComponentHandler:
             component_data: Component configuration data dictionary containing dependencies
         """
         try:
-            add_option = self.config.env.GetProjectOption("custom_component_add", None)
+            add_option = self.config.get_project_option("custom_component_add", None)
             if add_option:
                 # Split multiline option into individual components
                 components_to_add = add_option.splitlines()
@@ -256,7 +672,7 @@ class ComponentHandler:
         """
         backup_path = f"{file_path}.orig"
         if not os.path.exists(backup_path):
-            shutil.copy(file_path, backup_path)
+            shutil.copyfile(file_path, backup_path)
     
     def _create_default_component_yml(self, file_path: str) -> None:
         """
@@ -269,21 +685,15 @@ class ComponentHandler:
         Args:
             file_path: Absolute path where to create the new YAML file
         """
-        default_content = {
-            "dependencies": {
-                "idf": ">=5.1"
-            }
-        }
-        
         with open(file_path, 'w', encoding='utf-8') as f:
-            yaml.dump(default_content, f)
+            f.write(_DEFAULT_COMPONENT_YML)
     
     def _load_component_yml(self, file_path: str) -> Dict[str, Any]:
         """
         Load and parse idf_component.yml file safely.
         
         Attempts to load and parse the YAML file using SafeLoader for
-        security. Returns a default structure with empty dependencies
+        security (libyaml backed when available). Returns a default structure with empty dependencies
         if the file cannot be read or parsed.
         
         Args:
@@ -293,6 +703,7 @@ class ComponentHandler:
             Parsed YAML data as dictionary, or default structure on failure
         """
         try:
+            yaml, SafeLoader, _ = _load_yaml()
             with open(file_path, "r", encoding='utf-8') as f:
                 return yaml.load(f, Loader=SafeLoader) or {"dependencies": {}}
         except Exception:
@@ -311,8 +722,9 @@ class ComponentHandler:
             data: Component data dictionary to serialize
         """
         try:
+            yaml, _, SafeDumper = _load_yaml()
             with open(file_path, "w", encoding='utf-8') as f:
-                yaml.dump(data, f)
+                yaml.dump(data, f, Dumper=SafeDumper)
         except Exception:
             pass
     
@@ -414,14 +826,14 @@ class ComponentHandler:
         making modifications. Only operates when Arduino framework is active
         and creates MCU-specific backup names to avoid conflicts.
         """
-        if "arduino" not in self.config.env.subst("$PIOFRAMEWORK"):
+        if not self.config.arduino_active:
             return
         
-        build_py_path = join(self.config.arduino_libs_mcu, "pioarduino-build.py")
-        backup_path = join(self.config.arduino_libs_mcu, f"pioarduino-build.py.{self.config.mcu}")
+        build_py_path = self.config.build_py_path
+        backup_path = self.config.build_py_backup_path
         
         if os.path.exists(build_py_path) and not os.path.exists(backup_path):
-            shutil.copy2(build_py_path, backup_path)
+            _link_or_copy(build_py_path, backup_path)
     
     def _cleanup_removed_components(self) -> None:
         """
@@ -431,8 +843,13 @@ class ComponentHandler:
         including removing include directories and cleaning up CPPPATH
         entries from the build script.
         """
-        for component in self.removed_components:
-            self._remove_include_directory(component)
+        if len(self.removed_components) > 1:
+            # Directory removals are independent, overlap their I/O
+            with ThreadPoolExecutor(max_workers=min(8, len(self.removed_components))) as executor:
+                list(executor.map(self._remove_include_directory, self.removed_components))
+        else:
+            for component in self.removed_components:
+                self._remove_include_directory(component)
         
         self._remove_cpppath_entries()
     
@@ -447,9 +864,8 @@ class ComponentHandler:
             component: Component name in filesystem format
         """
         include_path = join(self.config.arduino_libs_mcu, "include", component)
-        
-        if os.path.exists(include_path):
-            shutil.rmtree(include_path)
+        # A missing directory is simply ignored, no separate existence probe
+        shutil.rmtree(include_path, ignore_errors=True)
     
     def _remove_cpppath_entries(self) -> None:
         """
@@ -459,31 +875,19 @@ class ComponentHandler:
         for all components that were removed from the project. Uses
         multiple regex patterns to catch different include path formats.
         """
-        build_py_path = join(self.config.arduino_libs_mcu, "pioarduino-build.py")
-        
-        if not os.path.exists(build_py_path):
+        if not self.build_file.exists():
             return
         
         try:
-            with open(build_py_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            original_content = content
+            content = self.build_file.load()
             
             # Remove CPPPATH entries for each removed component
-            for component in self.removed_components:
-                patterns = [
-                    rf'.*join\([^,]*,\s*"include",\s*"{re.escape(component)}"[^)]*\),?\n',
-                    rf'.*"include/{re.escape(component)}"[^,\n]*,?\n',
-                    rf'.*"[^"]*include[^"]*{re.escape(component)}[^"]*"[^,\n]*,?\n'
-                ]
-                
-                for pattern in patterns:
-                    content = re.sub(pattern, '', content)
-            
-            if content != original_content:
-                with open(build_py_path, 'w', encoding='utf-8') as f:
-                    f.write(content)
+            # Every pattern contains the literal name, components that do
+            # not appear in the file cannot match
+            present = tuple(sorted(c for c in self.removed_components if c in content))
+            if present:
+                content = _combined_include_pattern(present, _CPPPATH_PATTERN_COUNT).sub('', content)
+                self.build_file.update(content)
                 
         except Exception:
             pass
@@ -498,7 +902,7 @@ class LibraryIgnoreHandler:
     entries from the build script while protecting critical components.
     """
     
-    def __init__(self, config: ComponentManagerConfig, logger: ComponentLogger):
+    def __init__(self, config: ComponentManagerConfig, logger: ComponentLogger, build_file: BuildFileManager):
         """
         Initialize the library ignore handler.
         
@@ -509,13 +913,17 @@ class LibraryIgnoreHandler:
         Args:
             config: Configuration manager instance for accessing paths and settings
             logger: Logger instance for recording library operations
+            build_file: Shared in-memory build script modified by the handler
         """
         self.config = config
         self.logger = logger
+        self.build_file = build_file
         # Track ignored libraries for processing
         self.ignored_libs: Set[str] = set()
         # Cache for Arduino library mappings (lazy loaded)
         self._arduino_libraries_cache = None
+        # Cache for normalized lib_deps entries (lazy loaded)
+        self._lib_deps: Optional[List[str]] = None
     
     def handle_lib_ignore(self) -> None:
         """
@@ -525,17 +933,18 @@ class LibraryIgnoreHandler:
         processes lib_ignore entries from the current environment, and removes
         corresponding include paths from the build script.
         """
+        # Get lib_ignore entries from current environment only
+        lib_ignore_entries = self._get_lib_ignore_entries()
+        if not lib_ignore_entries:
+            return
+        
         # Create backup before processing lib_ignore
         if not self.ignored_libs:
             self._backup_pioarduino_build_py()
         
-        # Get lib_ignore entries from current environment only
-        lib_ignore_entries = self._get_lib_ignore_entries()
-        
-        if lib_ignore_entries:
-            self.ignored_libs.update(lib_ignore_entries)
-            self._remove_ignored_lib_includes()
-            self.logger.log_change(f"Processed {len(lib_ignore_entries)} ignored libraries")
+        self.ignored_libs.update(lib_ignore_entries)
+        self._remove_ignored_lib_includes()
+        self.logger.log_change(f"Processed {len(lib_ignore_entries)} ignored libraries")
     
     def _get_lib_ignore_entries(self) -> List[str]:
         """
@@ -550,43 +959,23 @@ class LibraryIgnoreHandler:
         """
         try:
             # Get lib_ignore from current environment only
-            lib_ignore = self.config.env.GetProjectOption("lib_ignore", [])
+            lib_ignore = self.config.get_project_option("lib_ignore", [])
             
             if isinstance(lib_ignore, str):
                 lib_ignore = [lib_ignore]
             elif lib_ignore is None:
                 lib_ignore = []
             
-            # Clean and normalize entries
-            cleaned_entries = []
-            for entry in lib_ignore:
-                entry = str(entry).strip()
-                if entry:
-                    # Convert library names to potential include directory names
-                    include_name = self._convert_lib_name_to_include(entry)
-                    cleaned_entries.append(include_name)
-            
-            # Filter out critical ESP32 components that should never be ignored
-            critical_components = [
-                'lwip',           # Network stack
-                'freertos',       # Real-time OS
-                'esp_system',     # System functions
-                'esp_common',     # Common ESP functions
-                'driver',         # Hardware drivers
-                'nvs_flash',      # Non-volatile storage
-                'spi_flash',      # Flash memory access
-                'esp_timer',      # Timer functions
-                'esp_event',      # Event system
-                'log'             # Logging system
+            # Clean entries, convert library names to potential include
+            # directory names and filter out critical ESP32 components
+            # that should never be ignored, all in one pass
+            return [
+                include_name
+                for raw_entry in lib_ignore
+                if (entry := str(raw_entry).strip())
+                and (include_name := self._convert_lib_name_to_include(entry)) not in _CRITICAL_COMPONENTS
             ]
             
-            filtered_entries = []
-            for entry in cleaned_entries:
-                if entry not in critical_components:
-                    filtered_entries.append(entry)
-            
-            return filtered_entries
-            
         except Exception:
             return []
     
@@ -602,23 +991,34 @@ class LibraryIgnoreHandler:
             True if BT/BLE dependencies are found in lib_deps
         """
         try:
-            # Get lib_deps from current environment
-            lib_deps = self.config.env.GetProjectOption("lib_deps", [])
+            # Check the joined lib_deps for BT/BLE keywords
+            lib_deps_str = ' '.join(self._get_lib_deps()).upper()
+
+            return _BT_BLE_KEYWORDS_RE.search(lib_deps_str) is not None
+            
+        except Exception:
+            return False
+    
+    def _get_lib_deps(self) -> List[str]:
+        """
+        Get normalized lib_deps entries of the current environment.
+        
+        The project option lookup goes through the SCons environment, so
+        the normalized list is resolved once and cached on the handler.
+        
+        Returns:
+            List of lib_deps entries as strings
+        """
+        if self._lib_deps is None:
+            lib_deps = self.config.get_project_option("lib_deps", [])
             
             if isinstance(lib_deps, str):
                 lib_deps = [lib_deps]
             elif lib_deps is None:
                 lib_deps = []
             
-            # Convert to string and check for BT/BLE keywords
-            lib_deps_str = ' '.join(str(dep) for dep in lib_deps).upper()
-            
-            bt_ble_keywords = ['BLE', 'BT', 'NIMBLE', 'BLUETOOTH']
-
-            return any(keyword in lib_deps_str for keyword in bt_ble_keywords)
-            
-        except Exception:
-            return False
+            self._lib_deps = [dep if isinstance(dep, str) else str(dep) for dep in lib_deps]
+        return self._lib_deps
     
     def _is_bt_related_library(self, lib_name: str) -> bool:
         """
@@ -634,22 +1034,7 @@ class LibraryIgnoreHandler:
         Returns:
             True if library name contains BT/BLE related keywords
         """
-        lib_name_upper = lib_name.upper()
-        
-        bt_related_names = [
-            'BT',
-            'BLE', 
-            'BLUETOOTH',
-            'NIMBLE',
-            'ESP32_BLE',
-            'ESP32BLE',
-            'BLUETOOTHSERIAL',
-            'BLE_ARDUINO',
-            'ESP_BLE',
-            'ESP_BT'
-        ]
-
-        return any(bt_name in lib_name_upper for bt_name in bt_related_names)
+        return _BT_RELATED_NAMES_RE.search(lib_name.upper()) is not None
     
     def _get_arduino_core_libraries(self) -> Dict[str, str]:
         """
@@ -657,7 +1042,9 @@ class LibraryIgnoreHandler:
         
         Scans the Arduino framework libraries directory to build a mapping
         of library names to their corresponding include paths. Reads
-        library.properties files to get official library names.
+        library.properties files to get official library names. The result
+        is cached on disk and reused as long as the modification time of
+        the libraries directory is unchanged.
         
         Returns:
             Dictionary mapping library names to include directory names
@@ -667,23 +1054,103 @@ class LibraryIgnoreHandler:
         # Path to Arduino Core Libraries
         arduino_libs_dir = join(self.config.arduino_framework_dir, "libraries")
         
-        if not os.path.exists(arduino_libs_dir):
+        try:
+            libs_mtime = os.stat(arduino_libs_dir).st_mtime_ns
+        except OSError:
             return libraries_mapping
         
+        # Reuse a mapping computed by another instance in this process
+        cache_key = (arduino_libs_dir, libs_mtime)
+        cached_mapping = _ARDUINO_LIBRARIES_CACHE.get(cache_key)
+        if cached_mapping is not None:
+            return cached_mapping
+        
+        cached_mapping = self._load_library_mapping_cache(libs_mtime)
+        if cached_mapping is not None:
+            _ARDUINO_LIBRARIES_CACHE[cache_key] = cached_mapping
+            return cached_mapping
+        
         try:
-            for entry in os.listdir(arduino_libs_dir):
-                lib_path = join(arduino_libs_dir, entry)
-                if os.path.isdir(lib_path):
-                    lib_name = self._get_library_name_from_properties(lib_path)
-                    if lib_name:
-                        include_path = self._map_library_to_include_path(lib_name, entry)
-                        libraries_mapping[lib_name.lower()] = include_path
-                        libraries_mapping[entry.lower()] = include_path  # Also use directory name as key
+            # scandir provides the entry type without an extra stat per entry
+            with os.scandir(arduino_libs_dir) as entries:
+                for entry in entries:
+                    if entry.is_dir():
+                        lib_name = self._get_library_name_from_properties(entry.path)
+                        if lib_name:
+                            include_path = self._map_library_to_include_path(lib_name, entry.name)
+                            libraries_mapping[lib_name.lower()] = include_path
+                            libraries_mapping[entry.name.lower()] = include_path  # Also use directory name as key
         except Exception:
-            pass
+            return libraries_mapping
         
+        self._save_library_mapping_cache(libs_mtime, libraries_mapping)
+        _ARDUINO_LIBRARIES_CACHE[cache_key] = libraries_mapping
         return libraries_mapping
     
+    def _get_library_mapping_cache_file(self) -> str:
+        """
+        Get the path of the on-disk Arduino library mapping cache.
+        
+        The cache lives in PlatformIO's cache directory, so it also works
+        for read-only framework installations. That directory is shared by
+        all installed platform versions, so the file name is derived from
+        both the framework directory and the mapping rules version.
+        
+        Returns:
+            Path to the JSON cache file in <core_dir>/.cache
+        """
+        framework_key = hashlib.blake2b(
+            f"{self.config.arduino_framework_dir}\0{_library_mapping_cache_version()}".encode("utf-8"),
+            digest_size=8
+        ).hexdigest()
+        return join(self.config.config.get("platformio", "core_dir"), ".cache",
+                    f"arduino_core_libs_{framework_key}.json")
+    
+    def _load_library_mapping_cache(self, libs_mtime: int) -> Optional[Dict[str, str]]:
+        """
+        Load the cached Arduino library mapping if it is still valid.
+        
+        Args:
+            libs_mtime: Current modification time (ns) of the libraries directory
+            
+        Returns:
+            Cached library mapping, or None if missing, unreadable or stale
+            (including one built from different mapping rules)
+        """
+        try:
+            with open(self._get_library_mapping_cache_file(), 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        
+        if (not isinstance(data, dict) or data.get("mtime") != libs_mtime or
+                data.get("version") != _library_mapping_cache_version()):
+            return None
+        mapping = data.get("map")
+        return mapping if isinstance(mapping, dict) else None
+    
+    def _save_library_mapping_cache(self, libs_mtime: int, mapping: Dict[str, str]) -> None:
+        """
+        Atomically write the Arduino library mapping to the on-disk cache.
+        
+        Args:
+            libs_mtime: Modification time (ns) of the libraries directory
+            mapping: Library name to include path mapping to store
+        """
+        cache_file = self._get_library_mapping_cache_file()
+        tmp_file = cache_file + ".tmp"
+        try:
+            os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump({
+                    "version": _library_mapping_cache_version(),
+                    "mtime": libs_mtime,
+                    "map": mapping,
+                }, f)
+            os.replace(tmp_file, cache_file)
+        except OSError:
+            pass
+    
     def _get_library_name_from_properties(self, lib_dir: str) -> Optional[str]:
         """
         Extract library name from library.properties file.
@@ -698,15 +1165,17 @@ class LibraryIgnoreHandler:
             Official library name or None if not found or readable
         """
         prop_path = join(lib_dir, "library.properties")
-        if not os.path.isfile(prop_path):
-            return None
         
+        # A missing file raises on open, no separate isfile probe needed
         try:
-            with open(prop_path, 'r', encoding='utf-8') as f:
-                for line in f:
-                    line = line.strip()
-                    if line.startswith('name='):
-                        return line.split('=', 1)[1].strip()
+            with open(prop_path, 'rb') as f:
+                # 'name=' is conventionally the first entry, so look at the
+                # head of the file first and only read on if it is missing
+                match = _PROPERTIES_NAME_RE.search(f.read(_PROPERTIES_HEAD_SIZE) + f.readline())
+                if match is None:
+                    match = _PROPERTIES_NAME_RE.search(f.read())
+            if match:
+                return match.group(1).strip().decode('utf-8', 'ignore')
         except Exception:
             pass
         
@@ -727,97 +1196,16 @@ class LibraryIgnoreHandler:
         Returns:
             Corresponding ESP-IDF component include path name
         """
-        lib_name_lower = lib_name.lower().replace(' ', '').replace('-', '_')
+        lib_key = lib_name.lower().translate(_LIB_KEY_TRANS)
         dir_name_lower = dir_name.lower()
         
-        # Extended mapping list with Arduino Core Libraries
-        extended_mapping = {
-            # Core ESP32 mappings
-            'wifi': 'esp_wifi',
-            'bluetooth': 'bt',
-            'bluetoothserial': 'bt',
-            'ble': 'bt',
-            'bt': 'bt',
-            'ethernet': 'esp_eth',
-            'websocket': 'esp_websocket_client',
-            'http': 'esp_http_client',
-            'https': 'esp_https_ota',
-            'ota': 'esp_https_ota',
-            'spiffs': 'spiffs',
-            'fatfs': 'fatfs',
-            'mesh': 'esp_wifi_mesh',
-            'smartconfig': 'esp_smartconfig',
-            'mdns': 'mdns',
-            'coap': 'coap',
-            'mqtt': 'mqtt',
-            'json': 'cjson',
-            'mbedtls': 'mbedtls',
-            'openssl': 'openssl',
-            
-            # Arduino Core specific mappings (safe mappings that don't conflict with critical components)
-            'esp32blearduino': 'bt',
-            'esp32_ble_arduino': 'bt',
-            'esp32': 'esp32',
-            'wire': 'driver',
-            'spi': 'driver',
-            'i2c': 'driver',
-            'uart': 'driver',
-            'serial': 'driver',
-            'analogwrite': 'driver',
-            'ledc': 'driver',
-            'pwm': 'driver',
-            'dac': 'driver',
-            'adc': 'driver',
-            'touch': 'driver',
-            'hall': 'driver',
-            'rtc': 'driver',
-            'timer': 'esp_timer',
-            'preferences': 'arduino_preferences',
-            'eeprom': 'arduino_eeprom',
-            'update': 'esp_https_ota',
-            'httpupdate': 'esp_https_ota',
-            'httpclient': 'esp_http_client',
-            'httpsclient': 'esp_https_ota',
-            'wifimanager': 'esp_wifi',
-            'wificlientsecure': 'esp_wifi',
-            'wifiserver': 'esp_wifi',
-            'wifiudp': 'esp_wifi',
-            'wificlient': 'esp_wifi',
-            'wifiap': 'esp_wifi',
-            'wifimulti': 'esp_wifi',
-            'esp32webserver': 'esp_http_server',
-            'webserver': 'esp_http_server',
-            'asyncwebserver': 'esp_http_server',
-            'dnsserver': 'lwip',
-            'netbios': 'netbios',
-            'simpletime': 'lwip',
-            'fs': 'vfs',
-            'sd': 'fatfs',
-            'sd_mmc': 'fatfs',
-            'littlefs': 'esp_littlefs',
-            'ffat': 'fatfs',
-            'camera': 'esp32_camera',
-            'esp_camera': 'esp32_camera',
-            'arducam': 'esp32_camera',
-            'rainmaker': 'esp_rainmaker',
-            'esp_rainmaker': 'esp_rainmaker',
-            'provisioning': 'wifi_provisioning',
-            'wifiprovisioning': 'wifi_provisioning',
-            'espnow': 'esp_now',
-            'esp_now': 'esp_now',
-            'esptouch': 'esp_smartconfig',
-            'ping': 'lwip',
-            'netif': 'lwip',
-            'tcpip': 'lwip'
-        }
-        
         # Check extended mapping first
-        if lib_name_lower in extended_mapping:
-            return extended_mapping[lib_name_lower]
+        if lib_key in _EXTENDED_MAPPING:
+            return _EXTENDED_MAPPING[lib_key]
         
         # Check directory name
-        if dir_name_lower in extended_mapping:
-            return extended_mapping[dir_name_lower]
+        if dir_name_lower in _EXTENDED_MAPPING:
+            return _EXTENDED_MAPPING[dir_name_lower]
         
         # Fallback: Use directory name as include path
         return dir_name_lower
@@ -850,30 +1238,20 @@ class LibraryIgnoreHandler:
         cleaned_name = lib_name_lower
         
         # Remove common prefixes
-        prefixes_to_remove = ['lib', 'arduino-', 'esp32-', 'esp-']
-        for prefix in prefixes_to_remove:
-            if cleaned_name.startswith(prefix):
-                cleaned_name = cleaned_name[len(prefix):]
+        for prefix in _PREFIXES_TO_REMOVE:
+            cleaned_name = cleaned_name.removeprefix(prefix)
         
         # Remove common suffixes
-        suffixes_to_remove = ['-lib', '-library', '.h']
-        for suffix in suffixes_to_remove:
-            if cleaned_name.endswith(suffix):
-                cleaned_name = cleaned_name[:-len(suffix)]
+        for suffix in _SUFFIXES_TO_REMOVE:
+            cleaned_name = cleaned_name.removesuffix(suffix)
         
         # Check again with cleaned name
         if cleaned_name in self._arduino_libraries_cache:
             return self._arduino_libraries_cache[cleaned_name]
         
         # Direct mapping for common cases not in Arduino libraries
-        direct_mapping = {
-            'ble': 'bt',
-            'bluetooth': 'bt',
-            'bluetoothserial': 'bt'
-        }
-        
-        if cleaned_name in direct_mapping:
-            return direct_mapping[cleaned_name]
+        if cleaned_name in _DIRECT_MAPPING:
+            return _DIRECT_MAPPING[cleaned_name]
         
         return cleaned_name
     
@@ -886,9 +1264,7 @@ class LibraryIgnoreHandler:
         components when dependencies are detected. Uses multiple regex
         patterns to catch different include path formats.
         """
-        build_py_path = join(self.config.arduino_libs_mcu, "pioarduino-build.py")
-        
-        if not os.path.exists(build_py_path):
+        if not self.build_file.exists():
             self.logger.log_change("Build file not found")
             return
         
@@ -898,13 +1274,13 @@ class LibraryIgnoreHandler:
             self.logger.log_change("BT/BLE protection enabled")
         
         try:
-            with open(build_py_path, 'r', encoding='utf-8') as f:
-                content = f.read()
+            content = self.build_file.load()
             
             original_content = content
             total_removed = 0
             
-            # Remove CPPPATH entries for each ignored library
+            # Collect the ignored libraries whose CPPPATH entries are removed
+            libs_to_remove = []
             for lib_name in self.ignored_libs:
                 # Skip BT-related libraries if BT/BLE dependencies are present
                 if bt_ble_protected and self._is_bt_related_library(lib_name):
@@ -912,41 +1288,37 @@ class LibraryIgnoreHandler:
                     continue
                 
                 # Hard protection for DSP components
-                if lib_name.lower() in ['dsp', 'esp_dsp', 'dsps', 'fft2r', 'dsps_fft2r']:
+                if lib_name.lower() in _DSP_PROTECTED_COMPONENTS:
                     self.logger.log_change(f"Protected DSP component: {lib_name}")
                     continue
                     
-                # Multiple patterns to catch different include formats
-                patterns = [
-                    rf'.*join\([^,]*,\s*"include",\s*"{re.escape(lib_name)}"[^)]*\),?\n',
-                    rf'.*"include/{re.escape(lib_name)}"[^,\n]*,?\n',
-                    rf'.*"[^"]*include[^"]*{re.escape(lib_name)}[^"]*"[^,\n]*,?\n',
-                    rf'.*"[^"]*/{re.escape(lib_name)}/include[^"]*"[^,\n]*,?\n',
-                    rf'.*"[^"]*{re.escape(lib_name)}[^"]*include[^"]*"[^,\n]*,?\n',
-                    rf'.*join\([^)]*"include"[^)]*"{re.escape(lib_name)}"[^)]*\),?\n',
-                    rf'.*"{re.escape(lib_name)}/include"[^,\n]*,?\n',
-                    rf'\s*"[^"]*/{re.escape(lib_name)}/[^"]*",?\n'
-                ]
-                
-                removed_count = 0
-                for pattern in patterns:
-                    matches = re.findall(pattern, content)
-                    if matches:
-                        content = re.sub(pattern, '', content)
-                        removed_count += len(matches)
-                
-                if removed_count > 0:
-                    self.logger.log_change(f"Ignored library: {lib_name} ({removed_count} entries)")
-                    total_removed += removed_count
+                # Every pattern contains the literal name, skip libraries
+                # that do not appear in the file at all
+                if lib_name in content:
+                    libs_to_remove.append(lib_name)
             
-            # Clean up empty lines and trailing commas
-            content = re.sub(r'\n\s*\n', '\n', content)
-            content = re.sub(r',\s*\n\s*\]', '\n]', content)
+            # Nothing can match, skip the line pass and its cleanup entirely
+            if not libs_to_remove:
+                return
+            
+            # Multiple patterns to catch different include formats, all
+            # libraries and patterns handled in a single pass
+            removed_counts = Counter()
+            pattern = _combined_include_pattern(tuple(sorted(libs_to_remove)))
+            content = self._filter_build_lines(content, pattern, libs_to_remove, removed_counts)
+            
+            # Report all removals in one summary line
+            removals = [(lib_name, removed_counts[lib_name])
+                        for lib_name in libs_to_remove if removed_counts[lib_name]]
+            if removals:
+                total_removed = sum(count for _, count in removals)
+                self.logger.log_change("Ignored libraries: " + ", ".join(
+                    f"{lib_name} ({count} entries)" for lib_name, count in removals
+                ))
             
             # Validate and write changes
             if self._validate_changes(original_content, content) and content != original_content:
-                with open(build_py_path, 'w', encoding='utf-8') as f:
-                    f.write(content)
+                self.build_file.update(content)
                 self.logger.log_change(f"Updated build file ({total_removed} total removals)")
                 
         except (IOError, OSError) as e:
@@ -954,6 +1326,62 @@ class LibraryIgnoreHandler:
         except Exception as e:
             self.logger.log_change(f"Unexpected error processing libraries: {str(e)}")
     
+    def _filter_build_lines(self, content: str, pattern: re.Pattern, names: List[str],
+                            removed_counts: Counter) -> str:
+        """
+        Remove include entries and clean up the build script line by line.
+        
+        Only lines containing one of the names as a substring are matched
+        against the include pattern, and matching lines are dropped. Empty
+        lines are dropped as well, and the trailing comma of an entry
+        directly before a closing bracket is removed along with the
+        bracket's indentation.
+        
+        Args:
+            content: Build script content
+            pattern: Combined include pattern of the names
+            names: Names that must appear in a line for the pattern to apply
+            removed_counts: Counter updated with removed lines per name
+            
+        Returns:
+            Filtered build script content
+        """
+        lines = content.split('\n')
+        last_index = len(lines) - 1
+        kept = []
+        
+        for index, line in enumerate(lines):
+            if index < last_index:
+                line += '\n'
+            if any(name in line for name in names):
+                match = pattern.match(line)
+                if match:
+                    removed_counts[match.group(match.lastindex)] += 1
+                    continue
+            if not line.strip():
+                continue
+            if kept and line.lstrip().startswith(']'):
+                previous = kept[-1].rstrip()
+                if previous.endswith(',') and kept[-1].endswith('\n'):
+                    kept[-1] = previous[:-1] + '\n'
+                    line = line.lstrip()
+            kept.append(line)
+        
+        return ''.join(kept)
+    
+    @staticmethod
+    def _count_lines(content: str) -> int:
+        """
+        Count lines like len(content.splitlines()) without building a list.
+        
+        Args:
+            content: Text to count the lines of
+            
+        Returns:
+            Number of lines, a final line without newline included
+        """
+        return content.count('\n') + bool(content) - content.endswith('\n')
+    
     def _validate_changes(self, original_content: str, new_content: str) -> bool:
         """
         Validate that the changes are reasonable and safe.
@@ -969,8 +1397,8 @@ class LibraryIgnoreHandler:
         Returns:
             True if changes are within acceptable limits and safe to apply
         """
-        original_lines = len(original_content.splitlines())
-        new_lines = len(new_content.splitlines())
+        original_lines = self._count_lines(original_content)
+        new_lines = self._count_lines(new_content)
         removed_lines = original_lines - new_lines
         
         # Don't allow removing more than 50% of the file or negative changes
@@ -984,14 +1412,14 @@ class LibraryIgnoreHandler:
         modifications. Only operates when Arduino framework is active
         and uses MCU-specific backup naming to avoid conflicts.
         """
-        if "arduino" not in self.config.env.subst("$PIOFRAMEWORK"):
+        if not self.config.arduino_active:
             return
         
-        build_py_path = join(self.config.arduino_libs_mcu, "pioarduino-build.py")
-        backup_path = join(self.config.arduino_libs_mcu, f"pioarduino-build.py.{self.config.mcu}")
+        build_py_path = self.config.build_py_path
+        backup_path = self.config.build_py_backup_path
         
         if os.path.exists(build_py_path) and not os.path.exists(backup_path):
-            shutil.copy2(build_py_path, backup_path)
+            _link_or_copy(build_py_path, backup_path)
 
 
 class BackupManager:
@@ -1023,14 +1451,14 @@ class BackupManager:
         with MCU-specific naming to prevent conflicts between different
         ESP32 variants. Only creates backup if it doesn't already exist.
         """
-        if "arduino" not in self.config.env.subst("$PIOFRAMEWORK"):
+        if not self.config.arduino_active:
             return
         
-        build_py_path = join(self.config.arduino_libs_mcu, "pioarduino-build.py")
-        backup_path = join(self.config.arduino_libs_mcu, f"pioarduino-build.py.{self.config.mcu}")
+        build_py_path = self.config.build_py_path
+        backup_path = self.config.build_py_backup_path
         
         if os.path.exists(build_py_path) and not os.path.exists(backup_path):
-            shutil.copy2(build_py_path, backup_path)
+            _link_or_copy(build_py_path, backup_path)
     
     def restore_pioarduino_build_py(self, target=None, source=None, env=None) -> None:
         """
@@ -1045,12 +1473,21 @@ class BackupManager:
             source: Build source (unused, for PlatformIO compatibility)
             env: Environment (unused, for PlatformIO compatibility)
         """
-        build_py_path = join(self.config.arduino_libs_mcu, "pioarduino-build.py")
-        backup_path = join(self.config.arduino_libs_mcu, f"pioarduino-build.py.{self.config.mcu}")
+        build_py_path = self.config.build_py_path
+        backup_path = self.config.build_py_backup_path
         
-        if os.path.exists(backup_path):
-            shutil.copy2(backup_path, build_py_path)
+        # A nested build may already have restored the script and removed
+        # the backup
+        try:
+            # Renaming restores contents and metadata without copying data
+            os.replace(backup_path, build_py_path)
+        except FileNotFoundError:
+            return
+        # Renaming a hard link onto the same file leaves both names
+        try:
             os.remove(backup_path)
+        except FileNotFoundError:
+            pass
 
 
 class ComponentManager:
@@ -1066,19 +1503,36 @@ class ComponentManager:
         """
         Initialize the ComponentManager with composition pattern.
         
-        Creates and configures all specialized handler instances using
-        the composition pattern for better separation of concerns and
-        maintainability. Each handler focuses on a specific aspect
-        of component management.
+        Creates the shared configuration and logger. The specialized
+        handlers are created on first access, so callers that only need
+        one of them (e.g. the restore post-action) don't pay for the rest.
+        Each handler focuses on a specific aspect of component management.
         
         Args:
             env: PlatformIO environment object containing project configuration
         """
         self.config = ComponentManagerConfig(env)
         self.logger = ComponentLogger()
-        self.component_handler = ComponentHandler(self.config, self.logger)
-        self.library_handler = LibraryIgnoreHandler(self.config, self.logger)
-        self.backup_manager = BackupManager(self.config)
+    
+    @functools.cached_property
+    def build_file(self) -> BuildFileManager:
+        """Shared in-memory pioarduino-build.py, created on first access."""
+        return BuildFileManager(self.config, self.logger)
+    
+    @functools.cached_property
+    def component_handler(self) -> ComponentHandler:
+        """Component addition/removal handler, created on first access."""
+        return ComponentHandler(self.config, self.logger, self.build_file)
+    
+    @functools.cached_property
+    def library_handler(self) -> LibraryIgnoreHandler:
+        """lib_ignore handler, created on first access."""
+        return LibraryIgnoreHandler(self.config, self.logger, self.build_file)
+    
+    @functools.cached_property
+    def backup_manager(self) -> BackupManager:
+        """Build script backup manager, created on first access."""
+        return BackupManager(self.config)
     
     def handle_component_settings(self, add_components: bool = False, remove_components: bool = False) -> None:
         """
@@ -1092,13 +1546,18 @@ class ComponentManager:
             add_components: Whether to process component additions from configuration
             remove_components: Whether to process component removals from configuration
         """
-        self.component_handler.handle_component_settings(add_components, remove_components)
-        self.library_handler.handle_lib_ignore()
-        
-        # Print summary
-        changes = self.logger.get_changes_summary()
-        if changes:
-            self.logger.log_change(f"Session completed with {len(changes)} changes")
+        try:
+            self.component_handler.handle_component_settings(add_components, remove_components)
+            self.library_handler.handle_lib_ignore()
+            # Write the build script once after all handlers applied their changes
+            self.build_file.flush()
+            
+            # Print summary
+            change_count = len(self.logger.component_changes)
+            if change_count:
+                self.logger.log_change(f"Session completed with {change_count} changes")
+        finally:
+            self.logger.flush()
     
     def handle_lib_ignore(self) -> None:
         """
@@ -1107,7 +1566,11 @@ class ComponentManager:
         Provides direct access to library ignore processing for cases
         where only library handling is needed without component operations.
         """
-        self.library_handler.handle_lib_ignore()
+        try:
+            self.library_handler.handle_lib_ignore()
+            self.build_file.flush()
+        finally:
+            self.logger.flush()
     
     def restore_pioarduino_build_py(self, target=None, source=None, env=None) -> None:
         """
@@ -111,7 +111,7 @@ if "arduino" in env.subst("$PIOFRAMEWORK"):
         os.rename(ARDUINO_FRAMEWORK_DIR, new_path)
         ARDUINO_FRAMEWORK_DIR = new_path
     assert ARDUINO_FRAMEWORK_DIR and os.path.isdir(ARDUINO_FRAMEWORK_DIR)
-    arduino_libs_mcu = join(platform.get_package_dir("framework-arduinoespressif32-libs"), mcu)
+    arduino_libs_mcu = join(ARDUINO_FRMWRK_LIB_DIR, mcu)
 
 BUILD_DIR = env.subst("$BUILD_DIR")
 PROJECT_DIR = env.subst("$PROJECT_DIR")
@@ -152,10 +152,13 @@ def HandleArduinoIDFsettings(env):
     Handles Arduino IDF settings configuration with custom sdkconfig support.
     """
     
-    def get_MD5_hash(phrase):
-        """Generate MD5 hash for checksum validation."""
+    def get_sdkconfig_hash(phrase):
+        """Generate BLAKE2b checksum seeded with the MCU name for validation."""
         import hashlib
-        return hashlib.md5(phrase.encode('utf-8')).hexdigest()[:16]
+        hasher = hashlib.blake2b(digest_size=8)
+        hasher.update(mcu.encode('utf-8'))
+        hasher.update(phrase.encode('utf-8'))
+        return hasher.hexdigest()
 
     def load_custom_sdkconfig_file():
         """Load custom sdkconfig from file or URL if specified."""
@@ -260,8 +263,8 @@ def HandleArduinoIDFsettings(env):
         sdkconfig_src = join(arduino_libs_mcu, "sdkconfig")
         sdkconfig_dst = join(PROJECT_DIR, "sdkconfig.defaults")
         
-        # Generate checksum for validation (maintains original logic)
-        checksum = get_MD5_hash(checksum_source.strip() + mcu)
+        # Generate checksum for validation (must match arduino.py)
+        checksum = get_sdkconfig_hash(checksum_source.strip())
         
         with open(sdkconfig_src, 'r', encoding='utf-8') as src, open(sdkconfig_dst, 'w', encoding='utf-8') as dst:
             # Write checksum header (critical for compilation decision logic)
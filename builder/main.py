@@ -12,6 +12,8 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import functools
+import importlib.metadata
 import locale
 import json
 import os
@@ -233,6 +235,20 @@ def _get_uv_executable_path(python_exe):
     return _get_executable_path(python_exe, "uv")
 
 
+@functools.lru_cache(maxsize=None)
+def _get_version_spec(spec):
+    """
+    Get a parsed version specification, reused across calls.
+    
+    Args:
+        spec (str): Version specification string
+        
+    Returns:
+        semantic_version.Spec: Parsed version specification
+    """
+    return semantic_version.Spec(spec)
+
+
 def get_packages_to_install(deps, installed_packages):
     """
     Generator for Python packages that need to be installed.
@@ -245,12 +261,115 @@ def get_packages_to_install(deps, installed_packages):
         str: Package name that needs to be installed
     """
     for package, spec in deps.items():
-        if package not in installed_packages:
+        installed_version = installed_packages.get(package)
+        if installed_version is None or not _get_version_spec(spec).match(installed_version):
             yield package
-        else:
-            version_spec = semantic_version.Spec(spec)
-            if not version_spec.match(installed_packages[package]):
-                yield package
+
+
+def _get_pip_cache_file():
+    """
+    Get the path of the on-disk cache holding the installed package list.
+
+    Returns:
+        str: Path to the package list cache file
+    """
+    return os.path.join(platformio_dir, ".cache", "pip_list.json")
+
+
+def _get_penv_fingerprint():
+    """
+    Get modification times identifying the current penv installation.
+
+    The executable is probed with lstat since on POSIX it is a symlink to the
+    base interpreter, whose mtime survives recreating the virtual environment.
+    The site-packages mtime changes whenever packages are added or removed.
+
+    Returns:
+        list: Modification times in nanoseconds
+    """
+    fingerprint = [os.lstat(PYTHON_EXE).st_mtime_ns]
+    if penv_site_packages:
+        fingerprint.append(os.stat(penv_site_packages).st_mtime_ns)
+    return fingerprint
+
+
+def _load_cached_pip_packages():
+    """
+    Load the cached package list if it belongs to the current penv.
+
+    The cache is keyed by the Python executable path and the penv
+    fingerprint, so recreating the virtual environment invalidates it.
+
+    Returns:
+        dict or None: Dictionary of installed packages with versions, or None on miss
+    """
+    try:
+        with open(_get_pip_cache_file(), "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if (data.get("python") != PYTHON_EXE or
+                data.get("fingerprint") != _get_penv_fingerprint()):
+            return None
+        return {
+            name: semantic_version.Version(version)
+            for name, version in data.get("packages", {}).items()
+        }
+    except (OSError, ValueError, TypeError, AttributeError):
+        return None
+
+
+def _save_cached_pip_packages(packages):
+    """
+    Atomically write the installed package list to the on-disk cache.
+
+    Args:
+        packages (dict): Dictionary of installed packages with versions
+    """
+    cache_file = _get_pip_cache_file()
+    tmp_file = cache_file + ".tmp"
+    try:
+        os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump({
+                "python": PYTHON_EXE,
+                "fingerprint": _get_penv_fingerprint(),
+                "packages": {name: str(version) for name, version in packages.items()},
+            }, f)
+        os.replace(tmp_file, cache_file)
+    except OSError:
+        pass
+
+
+def _invalidate_cached_pip_packages():
+    """
+    Remove the on-disk package list cache after the environment was modified.
+    """
+    try:
+        os.remove(_get_pip_cache_file())
+    except OSError:
+        pass
+
+
+def _get_installed_metadata_packages():
+    """
+    Get installed packages of the penv by reading its dist-info metadata in-process.
+
+    This reads the same metadata files uv and pip use, without spawning a subprocess.
+
+    Returns:
+        dict or None: Dictionary of installed packages with versions, or None if
+        the penv site-packages directory is not available
+    """
+    if not penv_site_packages or not os.path.isdir(penv_site_packages):
+        return None
+
+    result = {}
+    for dist in importlib.metadata.distributions(path=[penv_site_packages]):
+        try:
+            name = re.sub(r"[-_.]+", "-", dist.metadata["Name"]).lower()
+            result[name] = pepver_to_semver(dist.version)
+        except Exception:
+            continue
+    return result
 
 
 def install_python_deps():
@@ -260,6 +379,21 @@ def install_python_deps():
     Returns:
         bool: True if successful, False otherwise
     """
+    # Skip all subprocess calls when the cached package list satisfies every dependency
+    cached_packages = _load_cached_pip_packages()
+    if cached_packages is not None and not any(
+        get_packages_to_install(python_deps, cached_packages)
+    ):
+        return True
+
+    # Without any missing dependency there is no need to probe or call uv at all
+    metadata_packages = _get_installed_metadata_packages()
+    if metadata_packages is not None and not any(
+        get_packages_to_install(python_deps, metadata_packages)
+    ):
+        _save_cached_pip_packages(metadata_packages)
+        return True
+
     # Get uv executable path
     uv_executable = _get_uv_executable_path(PYTHON_EXE)
     
@@ -316,6 +450,10 @@ def install_python_deps():
         Returns:
             dict: Dictionary of installed packages with versions
         """
+        result = _get_installed_metadata_packages()
+        if result is not None:
+            return result
+
         result = {}
         try:
             cmd = [uv_executable, "pip", "list", "--format=json"]
@@ -353,7 +491,10 @@ def install_python_deps():
     installed_packages = _get_installed_uv_packages()
     packages_to_install = list(get_packages_to_install(python_deps, installed_packages))
     
-    if packages_to_install:
+    if not packages_to_install:
+        _save_cached_pip_packages(installed_packages)
+    else:
+        _invalidate_cached_pip_packages()
         packages_list = [f"{p}{python_deps[p]}" for p in packages_to_install]
         
         cmd = [